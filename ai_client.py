@@ -5,8 +5,75 @@ Handles communication with Pollinations.AI API
 
 import requests
 import json
+import socket
+import threading
+import weakref
 from typing import Optional, List, Dict
 
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from settings import BASE_URL
+
+
+class ChatCancelled(Exception):
+    """Raised when an in-flight chat request is cancelled via AIClient.cancel()"""
+
+
+class _CancellableAdapter(HTTPAdapter):
+    """HTTP adapter that tracks live connections so they can be closed from another thread"""
+    
+    def __init__(self, *args, **kwargs):
+        self._connections = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # Cancel token of the request being sent, checked as soon as a socket connects
+        self.cancel_token: Optional[threading.Event] = None
+        super().__init__(*args, **kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': self._tracking_pool(HTTPConnectionPool),
+            'https': self._tracking_pool(HTTPSConnectionPool),
+        }
+    
+    def _tracking_pool(self, pool_cls):
+        """Build a pool class whose connections register themselves on connect"""
+        adapter = self
+        
+        class TrackingConnection(pool_cls.ConnectionCls):
+            def connect(self):
+                super().connect()
+                with adapter._lock:
+                    adapter._connections.add(self)
+                
+                # A cancel that arrived before the socket was registered had nothing to close
+                token = adapter.cancel_token
+                if token is not None and token.is_set():
+                    adapter.abort()
+                    raise ConnectionAbortedError("Request cancelled")
+        
+        return type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': TrackingConnection})
+    
+    def abort(self):
+        """Shut down every live socket, waking up any thread blocked on it"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        
+        for conn in connections:
+            sock = getattr(conn, 'sock', None)
+            if sock is None:
+                continue
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                sock.close()
+            except OSError:
+                pass
+
 
 class AIClient:
     """Client for interacting with Pollinations.AI API"""
@@ -19,22 +86,41 @@ class AIClient:
             model: AI model to use (default: openai)
             temperature: Creativity level 0.0-3.0 (default: 1.0)
         """
-        self.base_url = "https://text.pollinations.ai"
+        self.base_url = BASE_URL
         self.model = model
         self.temperature = temperature
         self.conversation_history: List[Dict[str, str]] = []
+        self.last_error: Optional[str] = None  # Set when the last chat() failed
+        self._history_lock = threading.Lock()
         
-    def chat(self, user_message: str, system_prompt: Optional[str] = None) -> str:
+        # HTTP session with a cancellable adapter so requests can be aborted
+        self._adapter = _CancellableAdapter()
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+        
+    def chat(self, user_message: str, system_prompt: Optional[str] = None,
+             cancel_token: Optional[threading.Event] = None) -> str:
         """
         Send a message to the AI and get a response
         
         Args:
             user_message: The user's message
             system_prompt: Optional system prompt to guide AI behavior
+            cancel_token: Event that cancels this turn once set; create it when
+                the turn is dispatched so an early cancel is never lost
             
         Returns:
             AI's response as a string
+            
+        Raises:
+            ChatCancelled: If the turn was cancelled before or while it was in flight
         """
+        cancelled = cancel_token if cancel_token is not None else threading.Event()
+        self._adapter.cancel_token = cancelled
+        self.last_error = None
+        if cancelled.is_set():
+            raise ChatCancelled()
         try:
             # Build messages array
             messages = []
@@ -47,7 +133,8 @@ class AIClient:
                 })
             
             # Add conversation history
-            messages.extend(self.conversation_history)
+            with self._history_lock:
+                messages.extend(self.conversation_history)
             
             # Add current user message
             messages.append({
@@ -64,7 +151,7 @@ class AIClient:
             }
             
             # Make API request
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/openai",
                 json=payload,
                 timeout=60
@@ -76,7 +163,35 @@ class AIClient:
             result = response.json()
             ai_response = result['choices'][0]['message']['content']
             
+            # Don't commit history for a turn that was cancelled
+            if cancelled.is_set():
+                raise ChatCancelled()
+            
             # Update conversation history
+            self.record_exchange(user_message, ai_response)
+            
+            return ai_response
+            
+        except requests.exceptions.RequestException as e:
+            if cancelled.is_set():
+                raise ChatCancelled() from e
+            self.last_error = f"Error communicating with AI: {str(e)}"
+            return self.last_error
+        except (KeyError, json.JSONDecodeError) as e:
+            if cancelled.is_set():
+                raise ChatCancelled() from e
+            self.last_error = f"Error parsing AI response: {str(e)}"
+            return self.last_error
+    
+    def record_exchange(self, user_message: str, ai_response: str):
+        """
+        Append a user/assistant exchange to the conversation history
+        
+        Args:
+            user_message: The user's message
+            ai_response: The assistant's reply
+        """
+        with self._history_lock:
             self.conversation_history.append({
                 "role": "user",
                 "content": user_message
@@ -89,13 +204,18 @@ class AIClient:
             # Keep only last 10 messages to avoid token limits
             if len(self.conversation_history) > 20:
                 self.conversation_history = self.conversation_history[-20:]
-            
-            return ai_response
-            
-        except requests.exceptions.RequestException as e:
-            return f"Error communicating with AI: {str(e)}"
-        except (KeyError, json.JSONDecodeError) as e:
-            return f"Error parsing AI response: {str(e)}"
+    
+    def cancel(self):
+        """
+        Cancel the in-flight request, if any
+        
+        Safe to call from any thread. The turn's cancel token is set and the
+        connection is closed immediately, so the thread in chat() raises ChatCancelled.
+        """
+        token = self._adapter.cancel_token
+        if token is not None:
+            token.set()
+        self._adapter.abort()
     
     def simple_query(self, prompt: str) -> str:
         """
@@ -116,7 +236,7 @@ class AIClient:
                 "temperature": self.temperature
             }
             
-            response = requests.get(url, params=params, timeout=60)
+            response = self.session.get(url, params=params, timeout=60)
             response.raise_for_status()
             
             return response.text
@@ -126,7 +246,8 @@ class AIClient:
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        with self._history_lock:
+            self.conversation_history = []
     
     def set_temperature(self, temperature: float):
         """
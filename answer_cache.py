@@ -0,0 +1,212 @@
+"""
+Answer Cache for Kreggscode GPT
+Finds near-duplicate prompts locally so past answers can be reused
+"""
+
+import hashlib
+import re
+import struct
+import threading
+from collections import Counter, OrderedDict
+from typing import Optional, List, Dict, Tuple, FrozenSet
+
+
+class AnswerCache:
+    """MinHash/LSH index over past prompts and their answers"""
+    
+    # Cached hash rows are dropped once this many distinct shingles are seen
+    _MAX_CACHED_ROWS = 50000
+    
+    def __init__(self, threshold: float = 0.85, max_entries: int = 500,
+                 min_words: int = 4, bands: int = 20, rows: int = 3,
+                 max_candidates: int = 20):
+        """
+        Initialize Answer Cache
+        
+        Args:
+            threshold: Minimum Jaccard similarity to count as a match 0.0-1.0 (default: 0.85)
+            max_entries: Maximum number of answers kept; least recently used are evicted (default: 500)
+            min_words: Shorter prompts are never cached, since follow-ups like
+                "fix it" depend on the conversation (default: 4)
+            bands: Number of LSH bands (default: 20)
+            rows: Rows (signature values) per band (default: 3)
+            max_candidates: Most candidates verified per lookup, those sharing
+                the most bands first (default: 20)
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.min_words = min_words
+        self.enabled = True
+        self.bands = bands
+        self.rows = rows
+        self.max_candidates = max_candidates
+        
+        # Each shingle hashes to one row of bands * rows 32-bit values; the
+        # signature is the column-wise minimum, so it is computed in C
+        self._row_format = struct.Struct(f'<{bands * rows}I')
+        self._rows: Dict[str, Tuple[int, ...]] = {}
+        
+        # entry id -> (prompt, answer, shingles, band keys), in LRU order
+        self._entries: "OrderedDict[int, Tuple[str, str, FrozenSet[str], List[Tuple]]]" = OrderedDict()
+        # band key -> ids of entries that share it
+        self._buckets: Dict[Tuple, set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _shingles(self, text: str) -> FrozenSet[str]:
+        """
+        Get the character trigrams of normalized text
+        
+        Args:
+            text: Prompt text
+            
+        Returns:
+            Set of trigrams, empty if the prompt is shorter than min_words
+        """
+        words = re.findall(r'\w+', text.lower())
+        if len(words) < self.min_words:
+            return frozenset()
+        text = ' '.join(words)
+        if len(text) < 3:
+            return frozenset([text]) if text else frozenset()
+        return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+    
+    def _row(self, shingle: str) -> Tuple[int, ...]:
+        """
+        Get the MinHash row for a shingle, hashing it on first use
+        
+        Args:
+            shingle: A trigram
+            
+        Returns:
+            One 32-bit hash value per signature position
+        """
+        row = self._rows.get(shingle)
+        if row is None:
+            if len(self._rows) >= self._MAX_CACHED_ROWS:
+                self._rows.clear()
+            digest = hashlib.shake_128(shingle.encode('utf-8')).digest(self._row_format.size)
+            row = self._row_format.unpack(digest)
+            self._rows[shingle] = row
+        return row
+    
+    def _band_keys(self, shingles: FrozenSet[str]) -> List[Tuple]:
+        """
+        Compute the MinHash signature and split it into LSH band keys
+        
+        Args:
+            shingles: Trigrams of a prompt
+            
+        Returns:
+            One hashable key per band
+        """
+        rows = [self._row(shingle) for shingle in shingles]
+        signature = list(map(min, *rows)) if len(rows) > 1 else list(rows[0])
+        size = self.rows
+        return [(i,) + tuple(signature[i * size:(i + 1) * size]) for i in range(self.bands)]
+    
+    def add(self, prompt: str, answer: str):
+        """
+        Index a prompt and its answer
+        
+        Args:
+            prompt: The user's prompt
+            answer: The AI's answer to it
+        """
+        shingles = self._shingles(prompt)
+        if not shingles:
+            return
+        keys = self._band_keys(shingles)
+        
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (prompt, answer, shingles, keys)
+            for key in keys:
+                self._buckets.setdefault(key, set()).add(entry_id)
+            
+            # Evict least recently used entries over the cap
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+    
+    def _evict_oldest(self):
+        """Remove the least recently used entry and its bucket references"""
+        old_id, (_, _, _, keys) = self._entries.popitem(last=False)
+        for key in keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(old_id)
+                if not bucket:
+                    del self._buckets[key]
+    
+    def lookup(self, prompt: str) -> Optional[Tuple[float, str, str]]:
+        """
+        Find the most similar past prompt above the threshold
+        
+        Args:
+            prompt: The user's prompt
+            
+        Returns:
+            Tuple (similarity, past_prompt, answer) if found, None otherwise
+        """
+        if not self.enabled or not self._entries:
+            return None
+        
+        shingles = self._shingles(prompt)
+        if not shingles:
+            return None
+        keys = self._band_keys(shingles)
+        
+        with self._lock:
+            # Prompts with a common opening share buckets with most entries, so
+            # only the candidates sharing the most bands are verified
+            hits = Counter()
+            for key in keys:
+                hits.update(self._buckets.get(key, ()))
+            candidates = [entry_id for entry_id, _ in hits.most_common(self.max_candidates)]
+            
+            # Verify candidates with the exact Jaccard similarity
+            best_id, best_score = None, 0.0
+            for entry_id in candidates:
+                other = self._entries[entry_id][2]
+                common = len(shingles & other)
+                score = common / (len(shingles) + len(other) - common)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+            
+            if best_id is None or best_score < self.threshold:
+                return None
+            
+            self._entries.move_to_end(best_id)
+            past_prompt, answer, _, _ = self._entries[best_id]
+            return best_score, past_prompt, answer
+    
+    def set_threshold(self, threshold: float):
+        """
+        Set the similarity threshold
+        
+        Args:
+            threshold: Value between 0.0 (match anything) and 1.0 (exact wording only)
+        """
+        self.threshold = max(0.0, min(1.0, threshold))
+    
+    def set_max_entries(self, max_entries: int):
+        """
+        Set the maximum number of cached answers, evicting old ones if needed
+        
+        Args:
+            max_entries: New cap (at least 1)
+        """
+        with self._lock:
+            self.max_entries = max(1, max_entries)
+            while len(self._entries) > self.max_entries:
+                self._evict_oldest()
+    
+    def clear(self):
+        """Remove all cached answers"""
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
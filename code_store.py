@@ -0,0 +1,134 @@
+"""
+Code Block Store for Kreggscode GPT
+Keeps code blocks from every turn as offsets into the response text
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Tuple
+
+from file_manager import FileManager
+
+
+class CodeBlockStore:
+    """Per-session store of code blocks from previous turns"""
+    
+    def __init__(self, max_turns: int = 50, max_chars: int = 2_000_000):
+        """
+        Initialize Code Block Store
+        
+        Args:
+            max_turns: Maximum number of turns with code blocks kept (default: 50)
+            max_chars: Maximum total response text kept; oldest turns are evicted first (default: 2,000,000)
+        """
+        self.max_turns = max_turns
+        self.max_chars = max_chars
+        self.turn_count = 0
+        self.total_chars = 0
+        
+        # turn -> (response text, [(start, end, language, filename_hint), ...])
+        # The text is the same object held in the conversation history, so
+        # blocks cost only their offsets until they are copied or saved
+        self._turns: "OrderedDict[int, Tuple[str, List[Tuple[int, int, str, Optional[str]]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def add_turn(self, response: str) -> int:
+        """
+        Record the code blocks of a new response
+        
+        Args:
+            response: AI's response text
+            
+        Returns:
+            Number of the new turn (starting at 1)
+        """
+        blocks = FileManager.find_code_blocks(response)
+        
+        with self._lock:
+            self.turn_count += 1
+            turn = self.turn_count
+            
+            # Turns without code blocks take no space
+            if blocks:
+                self._turns[turn] = (response, blocks)
+                self.total_chars += len(response)
+                
+                # Evict oldest turns over the caps, but always keep the newest
+                while len(self._turns) > 1 and (
+                    len(self._turns) > self.max_turns or self.total_chars > self.max_chars
+                ):
+                    _, (text, _) = self._turns.popitem(last=False)
+                    self.total_chars -= len(text)
+            
+            return turn
+    
+    def block_count(self, turn: int) -> int:
+        """
+        Get the number of code blocks in a turn
+        
+        Args:
+            turn: Turn number
+            
+        Returns:
+            Number of blocks, 0 if the turn has none or was evicted
+        """
+        with self._lock:
+            entry = self._turns.get(turn)
+            return len(entry[1]) if entry else 0
+    
+    def latest_turn(self) -> Optional[int]:
+        """
+        Get the most recent turn that has code blocks
+        
+        Returns:
+            Turn number, or None if no blocks are stored
+        """
+        with self._lock:
+            return next(reversed(self._turns), None)
+    
+    def get(self, turn: int, index: int) -> Optional[Tuple[str, str, Optional[str]]]:
+        """
+        Get one code block
+        
+        Args:
+            turn: Turn number
+            index: Block number within the turn (1-based; negative counts from the end)
+            
+        Returns:
+            Tuple (language, code, filename_hint), or None if it doesn't exist
+        """
+        with self._lock:
+            entry = self._turns.get(turn)
+        if not entry:
+            return None
+        
+        text, blocks = entry
+        if index == 0 or not -len(blocks) <= index <= len(blocks):
+            return None
+        
+        start, end, lang, filename_hint = blocks[index - 1 if index > 0 else index]
+        return lang, text[start:end], filename_hint
+    
+    def code_blocks(self, turn: int) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Get all code blocks of a turn
+        
+        Args:
+            turn: Turn number
+            
+        Returns:
+            List of tuples (language, code, filename_hint)
+        """
+        with self._lock:
+            entry = self._turns.get(turn)
+        if not entry:
+            return []
+        
+        text, blocks = entry
+        return [(lang, text[start:end], filename_hint) for start, end, lang, filename_hint in blocks]
+    
+    def clear(self):
+        """Remove all stored blocks (turn numbers keep counting)"""
+        with self._lock:
+            self._turns.clear()
+            self.total_chars = 0
@@ -7,20 +7,28 @@ import os
 import re
 import stat
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from search_index import SearchIndex
 
 
 class FileManager:
     """Manages file creation and organization"""
     
-    def __init__(self, output_dir: str = "generated"):
+    # Pattern to match markdown code blocks with optional language
+    CODE_BLOCK_PATTERN = re.compile(r'```(\w+)?\n(.*?)```', re.DOTALL)
+    
+    def __init__(self, output_dir: str = "generated", search_index: Optional["SearchIndex"] = None):
         """
         Initialize File Manager
         
         Args:
             output_dir: Directory to save generated files (default: 'generated')
+            search_index: Optional index that saved files are added to
         """
         self.output_dir = Path(output_dir)
+        self.search_index = search_index
         # Create directory with proper permissions (cross-platform)
         try:
             self.output_dir.mkdir(exist_ok=True, parents=True)
@@ -81,30 +89,63 @@ class FileManager:
         text_lower = text.lower()
         return any(keyword in text_lower for keyword in keywords)
     
-    def extract_code_blocks(self, text: str) -> List[Tuple[str, str, str]]:
+    @staticmethod
+    def find_code_blocks(text: str) -> List[Tuple[int, int, str, Optional[str]]]:
         """
-        Extract code blocks from markdown-formatted text
+        Locate code blocks in markdown-formatted text without copying them
         
         Args:
             text: Text containing code blocks
             
         Returns:
-            List of tuples (language, code, filename_hint)
+            List of tuples (start, end, language, filename_hint) where
+            text[start:end] is the code with surrounding whitespace stripped
         """
-        # Pattern to match markdown code blocks with optional language
-        pattern = r'```(\w+)?\n(.*?)```'
-        matches = re.findall(pattern, text, re.DOTALL)
-        
         results = []
-        for lang, code in matches:
+        for match in FileManager.CODE_BLOCK_PATTERN.finditer(text):
+            lang = match.group(1)
             lang = lang.lower() if lang else 'text'
-            # Try to extract filename from comments
-            filename_hint = self._extract_filename_from_code(code, lang)
-            results.append((lang, code.strip(), filename_hint))
+            raw_start, raw_end = match.span(2)
+            
+            # Try to extract filename from comments in the first few lines
+            head_end = raw_start
+            for _ in range(5):
+                newline = text.find('\n', head_end, raw_end)
+                if newline == -1:
+                    head_end = raw_end
+                    break
+                head_end = newline + 1
+            filename_hint = FileManager._extract_filename_from_code(text[raw_start:head_end], lang)
+            
+            # Strip surrounding whitespace by moving the offsets
+            start, end = raw_start, raw_end
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            
+            results.append((start, end, lang, filename_hint))
         
         return results
     
-    def _extract_filename_from_code(self, code: str, lang: str) -> Optional[str]:
+    @staticmethod
+    def extract_code_blocks(text: str) -> List[Tuple[str, str, str]]:
+        """
+        Extract code blocks from markdown-formatted text
+        
+        Args:
+            text: Text containing code blocks
+            
+        Returns:
+            List of tuples (language, code, filename_hint)
+        """
+        return [
+            (lang, text[start:end], filename_hint)
+            for start, end, lang, filename_hint in FileManager.find_code_blocks(text)
+        ]
+    
+    @staticmethod
+    def _extract_filename_from_code(code: str, lang: str) -> Optional[str]:
         """
         Try to extract filename from code comments
         
@@ -176,6 +217,10 @@ class FileManager:
         except Exception as e:
             raise IOError(f"Failed to write file {filepath}: {str(e)}")
         
+        # Queue the file for search indexing (written in the background)
+        if self.search_index:
+            self.search_index.add_file(os.path.abspath(filepath), content)
+        
         return str(filepath)
     
     def _get_extension(self, language: Optional[str]) -> str:
@@ -194,13 +239,15 @@ class FileManager:
         language = language.lower()
         return self.extension_map.get(language, '.txt')
     
-    def process_ai_response(self, response: str, user_request: str) -> List[str]:
+    def process_ai_response(self, response: str, user_request: str,
+                            code_blocks: Optional[List[Tuple[str, str, str]]] = None) -> List[str]:
         """
         Process AI response and save any code blocks as files
         
         Args:
             response: AI's response text
             user_request: Original user request
+            code_blocks: Already extracted (language, code, filename_hint) tuples, if any
             
         Returns:
             List of saved file paths
@@ -208,7 +255,8 @@ class FileManager:
         saved_files = []
         
         # Extract code blocks - ALWAYS save if code blocks are present
-        code_blocks = self.extract_code_blocks(response)
+        if code_blocks is None:
+            code_blocks = self.extract_code_blocks(response)
         
         if not code_blocks:
             # No code blocks found - don't save anything
@@ -275,4 +323,7 @@ class FileManager:
                     item.unlink()
                     count += 1
         
+        if self.search_index:
+            self.search_index.forget_files()
+        
         return count
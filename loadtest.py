@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load Test for Kreggscode GPT
+Simulates many interactive users against a local stub server and reports
+throughput, turn latency, memory growth and file-write contention
+
+Example:
+    python loadtest.py --users 1,8,32,128 --turns 10 --latency lognormal:0.3,0.6
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Callable, Dict, List, Optional
+
+from ai_client import AIClient
+from file_manager import FileManager
+from settings import DEFAULT_SYSTEM_PROMPT
+
+
+# Prompts simulated users pick from; named files make users write the same paths
+PROMPTS = [
+    "Write a Python function that validates an email address with a regex",
+    "Create a file called utils.py with helpers for reading JSON config",
+    "Explain the difference between a list and a tuple",
+    "Generate code for a simple HTTP server in Go",
+    "Create a JavaScript file called app.js that fetches data from an API",
+    "Refactor the previous function to be async",
+    "Write a bash script that backs up a directory",
+    "Add unit tests for that code",
+]
+
+# Languages used in code blocks, with the extension FileManager gives them
+LANGUAGES = {'python': '.py', 'javascript': '.js', 'go': '.go', 'bash': '.sh', 'sql': '.sql', 'html': '.html'}
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a delay distribution spec
+    
+    Args:
+        spec: One of 'fixed:S', 'uniform:A,B', 'exp:MEAN' or 'lognormal:MEDIAN,SIGMA' (seconds)
+        
+    Returns:
+        Function that draws a delay in seconds from a random generator
+    """
+    name, _, args = spec.partition(':')
+    try:
+        values = [float(v) for v in args.split(',')] if args else []
+        if name == 'fixed' and len(values) == 1:
+            return lambda rng: values[0]
+        if name == 'uniform' and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if name == 'exp' and len(values) == 1:
+            return lambda rng: rng.expovariate(1.0 / values[0]) if values[0] > 0 else 0.0
+        if name == 'lognormal' and len(values) == 2:
+            mu = math.log(values[0])
+            return lambda rng: rng.lognormvariate(mu, values[1])
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(
+        f"Invalid distribution '{spec}'. Use fixed:S, uniform:A,B, exp:MEAN or lognormal:MEDIAN,SIGMA"
+    )
+
+
+def distribution_spec(spec: str) -> str:
+    """Validate a delay distribution spec but keep it as text, so it can be sent to another process"""
+    parse_distribution(spec)
+    return spec
+
+
+def build_response(rng: random.Random, blocks: int, block_lines: int) -> str:
+    """
+    Build a markdown answer with several code blocks, some with filename hints
+    
+    Args:
+        rng: Random generator
+        blocks: Number of code blocks
+        block_lines: Lines per code block
+        
+    Returns:
+        Response text
+    """
+    parts = ["Here is the code you asked for:\n"]
+    for i in range(blocks):
+        lang = rng.choice(list(LANGUAGES))
+        lines = []
+        # Half of the blocks name their file, from a small shared pool
+        if rng.random() < 0.5:
+            lines.append(f"# filename: shared_{rng.randrange(8)}{LANGUAGES[lang]}")
+        for n in range(block_lines):
+            lines.append(f"value_{n} = compute({n}, {rng.random():.6f})  # step {n} of block {i}")
+        parts.append(f"```{lang}\n" + "\n".join(lines) + "\n```\n")
+        parts.append("This block handles one part of the task.\n")
+    return "\n".join(parts)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /openai chat requests after a simulated model latency"""
+    
+    protocol_version = "HTTP/1.1"
+    
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        json.loads(self.rfile.read(length) or b'{}')
+        
+        server = self.server
+        with server.rng_lock:
+            delay = server.latency(server.rng)
+            content = build_response(server.rng, server.blocks, server.block_lines)
+        time.sleep(delay)
+        
+        body = json.dumps({"choices": [{"message": {"content": content}}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """Local stand-in for the Pollinations.AI chat endpoint"""
+    
+    daemon_threads = True
+    request_queue_size = 1024
+    
+    def __init__(self, latency: Callable[[random.Random], float], blocks: int,
+                 block_lines: int, seed: int = 0):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.latency = latency
+        self.blocks = blocks
+        self.block_lines = block_lines
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+    
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+def serve_stub(latency: str, blocks: int, block_lines: int, seed: int, conn):
+    """
+    Run a stub server until the process is terminated
+    
+    Started in a child process so the server's memory, threads and JSON
+    encoding don't count toward the sessions being measured.
+    
+    Args:
+        latency: Latency distribution spec
+        blocks: Code blocks per response
+        block_lines: Lines per code block
+        seed: Random seed
+        conn: Pipe connection the server URL is sent back on
+    """
+    server = StubServer(parse_distribution(latency), blocks, block_lines, seed=seed)
+    conn.send(server.url)
+    conn.close()
+    server.serve_forever()
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class SimulatedUser:
+    """One interactive session: think, ask, save code blocks, repeat"""
+    
+    def __init__(self, user_id: int, base_url: str, output_dir: str,
+                 think: Callable[[random.Random], float], seed: int):
+        """
+        Initialize a simulated user
+        
+        Args:
+            user_id: Index of this user
+            base_url: Stub server URL
+            output_dir: Directory shared by all users for saved files
+            think: Think-time distribution
+            seed: Random seed for this user
+        """
+        self.user_id = user_id
+        self.ai_client = AIClient(model="openai", temperature=1.0)
+        self.ai_client.base_url = base_url
+        self.file_manager = FileManager(output_dir=output_dir)
+        self.think = think
+        self.rng = random.Random(seed)
+        self.turns: List[Dict] = []
+    
+    def run(self, turns: int, start: threading.Event):
+        """
+        Run the session
+        
+        Args:
+            turns: Number of prompts to send
+            start: Event that releases all users at once
+        """
+        start.wait()
+        for _ in range(turns):
+            time.sleep(self.think(self.rng))
+            prompt = self.rng.choice(PROMPTS)
+            
+            began = time.perf_counter()
+            response = self.ai_client.chat(prompt, system_prompt=DEFAULT_SYSTEM_PROMPT)
+            answered = time.perf_counter()
+            saved_files = self.file_manager.process_ai_response(response, prompt)
+            finished = time.perf_counter()
+            
+            self.turns.append({
+                'latency': finished - began,
+                'save': finished - answered,
+                'files': saved_files,
+                'error': self.ai_client.last_error,
+            })
+
+
+def run_level(users: int, turns: int, server_url: str,
+              think: Callable[[random.Random], float], seed: int) -> Dict:
+    """
+    Run one concurrency level and collect its metrics
+    
+    Args:
+        users: Number of concurrent simulated users
+        turns: Turns per user
+        server_url: URL of the running stub server
+        think: Think-time distribution
+        seed: Base random seed
+        
+    Returns:
+        Dictionary of metrics for the level
+    """
+    output_dir = tempfile.mkdtemp(prefix="kreggscode_loadtest_")
+    rss_before = current_rss_mb()
+    
+    sessions = [
+        SimulatedUser(i, server_url, output_dir, think, seed + i)
+        for i in range(users)
+    ]
+    start = threading.Event()
+    threads = [
+        threading.Thread(target=session.run, args=(turns, start), daemon=True)
+        for session in sessions
+    ]
+    for thread in threads:
+        thread.start()
+    
+    began = time.perf_counter()
+    start.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    
+    rss_after = current_rss_mb()
+    shutil.rmtree(output_dir, ignore_errors=True)
+    
+    records = [turn for session in sessions for turn in session.turns]
+    latencies = [r['latency'] for r in records]
+    saves = [r['save'] for r in records]
+    
+    # A collision is a write to a path another write in this level already used
+    seen, collisions = set(), 0
+    for r in records:
+        for path in r['files']:
+            if path in seen:
+                collisions += 1
+            seen.add(path)
+    
+    return {
+        'users': users,
+        'turns': len(records),
+        'errors': sum(1 for r in records if r['error']),
+        'elapsed': elapsed,
+        'throughput': len(records) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+        'save_p50': percentile(saves, 50) * 1000,
+        'save_p99': percentile(saves, 99) * 1000,
+        'writes': sum(len(r['files']) for r in records),
+        'collisions': collisions,
+        'rss': rss_after,
+        'rss_growth': rss_after - rss_before,
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Entry point"""
+    parser = argparse.ArgumentParser(description="Load test Kreggscode GPT sessions against a local stub server")
+    parser.add_argument('--users', default="1,8,32",
+                        help="Comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument('--turns', type=int, default=10, help="Turns per user (default: 10)")
+    parser.add_argument('--latency', type=distribution_spec, default="lognormal:0.3,0.5",
+                        help="Stub server latency distribution (default: lognormal:0.3,0.5)")
+    parser.add_argument('--think', type=parse_distribution, default="exp:0.5",
+                        help="User think-time distribution (default: exp:0.5)")
+    parser.add_argument('--blocks', type=int, default=4, help="Code blocks per response (default: 4)")
+    parser.add_argument('--block-lines', type=int, default=40, help="Lines per code block (default: 40)")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+    
+    try:
+        levels = [int(v) for v in args.users.split(',')]
+    except ValueError:
+        parser.error("--users must be comma-separated integers")
+    
+    # The stub runs in its own process so it doesn't share memory or the GIL with the sessions
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(
+        target=serve_stub,
+        args=(args.latency, args.blocks, args.block_lines, args.seed, sender),
+        daemon=True
+    )
+    server.start()
+    sender.close()
+    server_url = receiver.recv()
+    receiver.close()
+    
+    columns = [
+        ('users', "Users", "{:d}"), ('turns', "Turns", "{:d}"), ('throughput', "Turns/s", "{:.1f}"),
+        ('p50', "p50 ms", "{:.0f}"), ('p99', "p99 ms", "{:.0f}"),
+        ('save_p50', "Save p50 ms", "{:.2f}"), ('save_p99', "Save p99 ms", "{:.2f}"),
+        ('collisions', "Collisions", "{:d}"), ('errors', "Errors", "{:d}"),
+        ('rss', "RSS MB", "{:.1f}"), ('rss_growth', "ΔRSS MB", "{:+.1f}"),
+    ]
+    if not args.json:
+        print("  ".join(f"{title:>{max(len(title), 7)}}" for _, title, _ in columns))
+    
+    results = []
+    try:
+        for users in levels:
+            result = run_level(users, args.turns, server_url, args.think, args.seed)
+            results.append(result)
+            if not args.json:
+                print("  ".join(
+                    f"{fmt.format(result[key]):>{max(len(title), 7)}}" for key, title, fmt in columns
+                ), flush=True)
+    finally:
+        server.terminate()
+        server.join()
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
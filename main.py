@@ -5,41 +5,65 @@ Kreggscode GPT - Interactive CLI AI Assistant
 A beautiful, cross-platform CLI tool for AI-powered code generation
 """
 
+import os
+import re
 import sys
 import time
+import queue
+import threading
 import pyperclip
 from pathlib import Path
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from rich.prompt import Prompt
+from rich.prompt import Prompt, Confirm
 from rich.markdown import Markdown
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.markup import escape
 from rich import box
 from rich.table import Table
 from langdetect import detect, LangDetectException
 
-from ai_client import AIClient
+from ai_client import AIClient, ChatCancelled
 from file_manager import FileManager
+from answer_cache import AnswerCache
+from code_store import CodeBlockStore
+from search_index import SearchIndex
+from settings import DEFAULT_SYSTEM_PROMPT
 
 
 class KreggscodeGPT:
     """Main application class for Kreggscode GPT"""
     
+    # "save <n>" or "save <turn>:<n>", optionally followed by a filename with an extension
+    SAVE_COMMAND = re.compile(r'save\s+(\d+(?::\d+)?)(?:\s+(\S+\.\w+))?$', re.IGNORECASE)
+    
     def __init__(self):
         """Initialize the application"""
         self.console = Console()
         self.ai_client = AIClient(model="openai", temperature=1.0)
-        self.file_manager = FileManager(output_dir="generated")
+        try:
+            self.search_index = SearchIndex()
+        except Exception:
+            # Search is optional (e.g. SQLite built without FTS5)
+            self.search_index = None
+        self.file_manager = FileManager(output_dir="generated", search_index=self.search_index)
+        # Tuned on trigram Jaccard scores: rewordings of the same question (case,
+        # punctuation, dropped words, typos, "please") score 0.86-1.0, while one-word
+        # changes in meaning (Python -> Rust, string -> list, reverse -> sort) score 0.6-0.76
+        self.answer_cache = AnswerCache(threshold=0.85, max_entries=500)
         self.running = True
-        self.last_code_blocks = []  # Store last code blocks for copying
+        self.code_store = CodeBlockStore()  # Code blocks from every turn, for copying and saving
+        
+        # Background worker state: prompts queue up while a turn is in flight
+        self.pending_prompts = queue.Queue()
+        self.turn_in_flight = threading.Event()
+        self.worker = None
+        # Cancel token shared by every prompt queued since the last cancel
+        self.cancel_token = threading.Event()
         
         # System prompts for different scenarios
-        self.base_system_prompt = """You are Kreggscode GPT, a helpful AI assistant.
-You are knowledgeable, friendly, and excellent at programming and technical tasks.
-When users ask you to create files, provide the code in markdown code blocks with the language specified.
-Always be helpful and respond in the same language as the user's input."""
+        self.base_system_prompt = DEFAULT_SYSTEM_PROMPT
     
     def show_banner(self):
         """Display beautiful ASCII banner"""
@@ -100,11 +124,15 @@ Always be helpful and respond in the same language as the user's input."""
             ("clear", "Clear conversation history"),
             ("copy", "Copy last code block to clipboard"),
             ("copy <n>", "Copy specific code block number"),
+            ("copy <turn>:<n>", "Copy a code block from an earlier turn"),
+            ("save <turn>:<n> [name.ext]", "Save a code block from any turn as a file"),
             ("files", "List all generated files"),
+            ("search: <query>", "Search past conversations and generated files"),
             ("open", "Open generated files folder"),
             ("clean", "Delete all generated files"),
             ("temp <value>", "Set AI temperature (0.0-3.0)"),
             ("model <name>", "Change AI model"),
+            ("cache <value>", "Set similarity for reusing past answers (0.0-1.0, or on/off)"),
             ("exit / quit", "Exit the application"),
         ]
         
@@ -140,8 +168,11 @@ Always be helpful and respond in the same language as the user's input."""
             True if command was processed, False otherwise
         """
         command = user_input.lower().strip()
+        # Matched on the original input to keep the filename's case
+        save_match = self.SAVE_COMMAND.match(user_input.strip())
         
         if command in ['exit', 'quit', 'q']:
+            self.cancel_turns()
             self.console.print("\n[bold cyan]Thank you for using Kreggscode GPT! Goodbye! 👋[/bold cyan]\n")
             self.running = False
             return True
@@ -155,48 +186,53 @@ Always be helpful and respond in the same language as the user's input."""
             self.console.print("[green]✓[/green] Conversation history cleared!", style="bold")
             return True
         
-        elif command.startswith('copy'):
+        elif command == 'copy' or command.startswith('copy '):
             try:
-                # Extract code block number if specified
+                # Extract code block reference if specified
                 parts = command.split()
-                if len(parts) == 1:
-                    # Copy last code block
-                    index = -1
-                else:
-                    # Copy specific code block
-                    index = int(parts[1]) - 1
-                
-                if not self.last_code_blocks:
-                    self.console.print("[yellow]⚠[/yellow] No code blocks available to copy.", style="bold")
-                    return True
-                
-                if index < -len(self.last_code_blocks) or index >= len(self.last_code_blocks):
-                    self.console.print(f"[red]✗[/red] Invalid code block number. Available: 1-{len(self.last_code_blocks)}", style="bold")
-                    return True
+                turn, index, (lang, code_to_copy, _) = self.resolve_code_block(parts[1] if len(parts) > 1 else None)
                 
                 # Copy to clipboard
-                code_to_copy = self.last_code_blocks[index]
                 pyperclip.copy(code_to_copy)
-                self.console.print(f"[green]✓[/green] Code block copied to clipboard! ({len(code_to_copy)} characters)", style="bold")
+                self.console.print(f"[green]✓[/green] Code block {turn}:{index} copied to clipboard! ({len(code_to_copy)} characters)", style="bold")
+            except LookupError as e:
+                self.console.print(f"[yellow]⚠[/yellow] {str(e)}", style="bold")
             except ValueError:
-                self.console.print("[red]✗[/red] Invalid copy command. Use: copy or copy <number>", style="bold")
+                self.console.print("[red]✗[/red] Invalid copy command. Use: copy, copy <n> or copy <turn>:<n>", style="bold")
             except Exception as e:
                 self.console.print(f"[red]✗[/red] Failed to copy: {str(e)}", style="bold")
             return True
         
+        # Anything else starting with "save" (e.g. "save 3 files to S3") is a prompt for the AI
+        elif save_match:
+            try:
+                turn, index, (lang, code, filename_hint) = self.resolve_code_block(save_match.group(1))
+                filename = save_match.group(2) or filename_hint
+                
+                filepath = self.file_manager.save_file(code, filename, lang)
+                self.console.print(f"[green]✓[/green] Code block {turn}:{index} saved to [yellow]{os.path.abspath(filepath)}[/yellow]", style="bold")
+            except LookupError as e:
+                self.console.print(f"[yellow]⚠[/yellow] {str(e)}", style="bold")
+            except Exception as e:
+                self.console.print(f"[red]✗[/red] Failed to save: {str(e)}", style="bold")
+            return True
+        
         elif command == 'files':
             files = self.file_manager.list_generated_files()
             if files:
                 self.console.print(f"\n[bold cyan]Generated Files ({len(files)}):[/bold cyan]")
                 for i, filepath in enumerate(files, 1):
-                    import os
                     self.console.print(f"  {i}. [yellow]{os.path.abspath(filepath)}[/yellow]")
             else:
                 self.console.print("[dim]No files generated yet.[/dim]")
             return True
         
+        # The colon keeps prompts like "search algorithms in python" going to the AI
+        elif command.startswith('search:'):
+            self.show_search_results(user_input.strip()[len('search:'):].strip())
+            return True
+        
         elif command == 'open':
-            import os
             import subprocess
             import platform
             
@@ -239,10 +275,270 @@ Always be helpful and respond in the same language as the user's input."""
                 self.console.print("[red]✗[/red] Invalid model name. Use: model <name>", style="bold")
             return True
         
+        # Anything else starting with "cache" is a prompt for the AI
+        elif re.match(r'cache\s+(on|off|\d*\.?\d+)$', command):
+            value = command.split()[1]
+            if value in ['on', 'off']:
+                self.answer_cache.enabled = value == 'on'
+                self.console.print(f"[green]✓[/green] Answer cache turned {value}", style="bold")
+                return True
+            self.answer_cache.set_threshold(float(value))
+            self.answer_cache.enabled = True
+            self.console.print(f"[green]✓[/green] Answer cache similarity set to {self.answer_cache.threshold}", style="bold")
+            return True
+        
         return False
     
+    def resolve_code_block(self, ref):
+        """
+        Look up a stored code block
+        
+        Args:
+            ref: 'n' for block n of the latest turn, 'turn:n' for an earlier
+                 turn, or None for the last block of the latest turn
+            
+        Returns:
+            Tuple (turn, block_number, (language, code, filename_hint))
+            
+        Raises:
+            ValueError: If the reference is malformed
+            LookupError: If the block doesn't exist
+        """
+        if ref and ':' in ref:
+            turn_part, index_part = ref.split(':', 1)
+            turn, index = int(turn_part), int(index_part)
+        else:
+            turn = self.code_store.latest_turn()
+            index = int(ref) if ref else -1
+            if turn is None:
+                raise LookupError("No code blocks available.")
+        
+        count = self.code_store.block_count(turn)
+        if not count:
+            raise LookupError(f"Turn {turn} has no stored code blocks.")
+        
+        block = self.code_store.get(turn, index)
+        if block is None:
+            raise LookupError(f"Invalid code block number. Turn {turn} has blocks 1-{count}.")
+        
+        return turn, index if index > 0 else count + index + 1, block
+    
+    def show_search_results(self, query: str):
+        """
+        Display ranked search hits for past conversations and files
+        
+        Args:
+            query: Words to search for
+        """
+        if not self.search_index:
+            self.console.print("[yellow]⚠[/yellow] Search is not available on this system.", style="bold")
+            return
+        
+        start = time.perf_counter()
+        hits = self.search_index.search(query, highlight=('\x02', '\x03'))
+        elapsed = (time.perf_counter() - start) * 1000
+        
+        if not hits:
+            self.console.print(f"[dim]No matches for '{escape(query)}'.[/dim]")
+            return
+        
+        results_table = Table(
+            title=f"Search Results ({len(hits)} in {elapsed:.1f} ms)",
+            box=box.ROUNDED,
+            border_style="cyan"
+        )
+        results_table.add_column("#", style="cyan", no_wrap=True)
+        results_table.add_column("Where", style="yellow")
+        results_table.add_column("Match", style="white")
+        
+        for i, hit in enumerate(hits, 1):
+            when = time.strftime('%Y-%m-%d %H:%M', time.localtime(hit['created']))
+            if hit['kind'] == 'file':
+                where = f"{escape(hit['path'])}\n[dim]{when}[/dim]"
+            else:
+                where = f"[dim]You asked:[/dim] {escape(hit['prompt'][:60])}\n[dim]{when}[/dim]"
+                if hit['path']:
+                    where += "\n" + escape(hit['path'])
+            
+            snippet = escape(' '.join(hit['snippet'].split()))
+            snippet = snippet.replace('\x02', '[bold green]').replace('\x03', '[/bold green]')
+            results_table.add_row(str(i), where, snippet)
+        
+        self.console.print(results_table)
+    
+    def offer_cached_answer(self, user_input: str) -> bool:
+        """
+        Offer a past answer if a near-duplicate prompt was asked before
+        
+        Only offered while no turn is in flight or queued, so the reused answer
+        is committed to history in order and the question doesn't interleave
+        with the worker's output.
+        
+        Args:
+            user_input: User's input
+            
+        Returns:
+            True if the cached answer was used, False otherwise
+        """
+        if self.turn_in_flight.is_set() or not self.pending_prompts.empty():
+            return False
+        
+        match = self.answer_cache.lookup(user_input)
+        if not match:
+            return False
+        
+        similarity, past_prompt, answer = match
+        self.console.print(
+            f"[dim]You asked something similar before ({similarity:.0%} match):[/dim] [yellow]{escape(past_prompt)}[/yellow]"
+        )
+        if not Confirm.ask("[bold cyan]Use the saved answer?[/bold cyan]", default=False, console=self.console):
+            return False
+        
+        self.ai_client.record_exchange(user_input, answer)
+        self.show_response(user_input, answer)
+        return True
+    
+    def start_worker(self):
+        """Start the background thread that sends queued prompts to the AI"""
+        if self.worker is None or not self.worker.is_alive():
+            self.worker = threading.Thread(target=self.worker_loop, name="chat-worker", daemon=True)
+            self.worker.start()
+    
+    def worker_loop(self):
+        """Send queued prompts one at a time, after the previous turn's history is committed"""
+        while True:
+            item = self.pending_prompts.get()
+            if item is None:
+                break
+            
+            user_input, cancel_token = item
+            self.turn_in_flight.set()
+            try:
+                response = self.ai_client.chat(
+                    user_input,
+                    system_prompt=self.base_system_prompt,
+                    cancel_token=cancel_token
+                )
+                self.show_response(user_input, response)
+                
+                # Remember successful answers for near-duplicate prompts
+                if self.ai_client.last_error is None:
+                    self.answer_cache.add(user_input, response)
+            except ChatCancelled:
+                pass
+            except Exception as e:
+                self.console.print(f"\n[red]✗ Error:[/red] {str(e)}", style="bold")
+            finally:
+                self.turn_in_flight.clear()
+                self.pending_prompts.task_done()
+            
+            # Show the prompt again once nothing is left to answer
+            if self.running and self.pending_prompts.empty():
+                self.console.print("\n[bold cyan]You[/bold cyan]: ", end="")
+    
+    def cancel_turns(self) -> bool:
+        """
+        Cancel the in-flight request and drop any queued prompts
+        
+        Returns:
+            True if anything was cancelled, False if the worker was idle
+        """
+        # Prompts queued or taken by the worker but not finished yet, including
+        # one dequeued just before turn_in_flight is set
+        busy = self.pending_prompts.unfinished_tasks > 0
+        
+        # Cancel every prompt dispatched so far, even one the worker has just
+        # taken off the queue, and give later prompts a fresh token
+        self.cancel_token.set()
+        self.cancel_token = threading.Event()
+        
+        while True:
+            try:
+                self.pending_prompts.get_nowait()
+            except queue.Empty:
+                break
+            self.pending_prompts.task_done()
+        
+        if busy:
+            self.ai_client.cancel()
+        
+        return busy
+    
+    def show_response(self, user_input: str, response: str):
+        """
+        Display an AI response and save any code blocks it contains
+        
+        Args:
+            user_input: The prompt that produced the response
+            response: AI's response text
+        """
+        # Buffer the whole turn so it isn't interleaved with other output
+        with self.console:
+            # Display response
+            self.console.print("\n\n[bold magenta]Kreggscode GPT[/bold magenta]:")
+            
+            # Record code blocks for copying
+            turn = self.code_store.add_turn(response)
+            block_count = self.code_store.block_count(turn)
+            
+            # Try to render as markdown if it contains code blocks
+            if '```' in response:
+                try:
+                    # Display markdown
+                    md = Markdown(response)
+                    self.console.print(md)
+                    
+                    # Show copy hint for code blocks
+                    if block_count:
+                        copy_panel = Panel(
+                            f"[bold cyan]📋 {block_count} code block(s) ready to copy! (turn {turn})[/bold cyan]\n\n"
+                            f"[white]Type '[bold green]copy[/bold green]' to copy the last block[/white]\n"
+                            f"[white]Type '[bold green]copy 1[/bold green]', '[bold green]copy 2[/bold green]', etc. for specific blocks[/white]\n"
+                            f"[white]Type '[bold green]copy {turn}:1[/bold green]' later to reach this turn's blocks[/white]",
+                            title="[bold cyan]Copy to Clipboard[/bold cyan]",
+                            border_style="green",
+                            box=box.ROUNDED
+                        )
+                        self.console.print(copy_panel)
+                except Exception:
+                    self.console.print(response)
+            else:
+                self.console.print(response)
+            
+            # Check if file creation was requested
+            saved_files = self.file_manager.process_ai_response(
+                response, user_input, code_blocks=self.code_store.code_blocks(turn)
+            )
+            
+            # Queue the turn for search indexing (written in the background)
+            if self.search_index:
+                self.search_index.add_turn(
+                    user_input, response,
+                    [os.path.abspath(filepath) for filepath in saved_files]
+                )
+            
+            if saved_files:
+                # Show prominent file save notification
+                file_messages = []
+                for i, filepath in enumerate(saved_files, 1):
+                    file_messages.append(f"[bold green]✓ File #{i} saved successfully![/bold green]")
+                    file_messages.append(f"[white]Location:[/white] [yellow]{os.path.abspath(filepath)}[/yellow]")
+                    file_messages.append(f"[dim]You can open this file in any editor[/dim]")
+                    if i < len(saved_files):
+                        file_messages.append("")  # Add spacing between files
+                
+                files_panel = Panel(
+                    "\n".join(file_messages),
+                    title="[bold green]💾 Files Saved to Your Computer[/bold green]",
+                    border_style="green",
+                    box=box.DOUBLE
+                )
+                self.console.print(files_panel)
+    
     def chat_loop(self):
         """Main chat loop"""
+        self.start_worker()
+        
         while self.running:
             try:
                 # Get user input
@@ -251,89 +547,43 @@ Always be helpful and respond in the same language as the user's input."""
                 if not user_input.strip():
                     continue
                 
-                # Check for commands
+                # Check for commands - these run immediately, even mid-turn
                 if self.process_command(user_input):
                     continue
                 
+                # Reuse a past answer for a near-duplicate prompt
+                if self.offer_cached_answer(user_input):
+                    continue
+                
                 # Detect language
                 lang = self.detect_language(user_input)
                 
-                # Show thinking animation
-                with Progress(
-                    SpinnerColumn(),
-                    TextColumn("[bold cyan]Kreggscode GPT is thinking...[/bold cyan]"),
-                    transient=True,
-                    console=self.console
-                ) as progress:
-                    progress.add_task("thinking", total=None)
-                    
-                    # Get AI response
-                    response = self.ai_client.chat(
-                        user_input,
-                        system_prompt=self.base_system_prompt
-                    )
-                
-                # Display response
-                self.console.print("\n[bold magenta]Kreggscode GPT[/bold magenta]:")
-                
-                # Extract code blocks for copying
-                import re
-                code_pattern = r'```(?:\w+)?\n(.*?)```'
-                code_blocks = re.findall(code_pattern, response, re.DOTALL)
-                if code_blocks:
-                    self.last_code_blocks = [block.strip() for block in code_blocks]
+                # Queue the prompt; the worker sends it once the previous turn is done
+                ahead = self.pending_prompts.qsize() + (1 if self.turn_in_flight.is_set() else 0)
+                self.pending_prompts.put((user_input, self.cancel_token))
                 
-                # Try to render as markdown if it contains code blocks
-                if '```' in response:
-                    try:
-                        # Display markdown
-                        md = Markdown(response)
-                        self.console.print(md)
-                        
-                        # Show copy hint for code blocks
-                        if self.last_code_blocks:
-                            copy_panel = Panel(
-                                f"[bold cyan]📋 {len(self.last_code_blocks)} code block(s) ready to copy![/bold cyan]\n\n"
-                                f"[white]Type '[bold green]copy[/bold green]' to copy the last block[/white]\n"
-                                f"[white]Type '[bold green]copy 1[/bold green]', '[bold green]copy 2[/bold green]', etc. for specific blocks[/white]",
-                                title="[bold cyan]Copy to Clipboard[/bold cyan]",
-                                border_style="green",
-                                box=box.ROUNDED
-                            )
-                            self.console.print(copy_panel)
-                    except Exception:
-                        self.console.print(response)
+                if ahead:
+                    self.console.print(f"[dim]Queued ({ahead} ahead). Keep typing or press Ctrl+C to cancel.[/dim]")
                 else:
-                    self.console.print(response)
-                
-                # Check if file creation was requested
-                saved_files = self.file_manager.process_ai_response(response, user_input)
-                
-                if saved_files:
-                    # Show prominent file save notification
-                    import os
-                    file_messages = []
-                    for i, filepath in enumerate(saved_files, 1):
-                        file_messages.append(f"[bold green]✓ File #{i} saved successfully![/bold green]")
-                        file_messages.append(f"[white]Location:[/white] [yellow]{os.path.abspath(filepath)}[/yellow]")
-                        file_messages.append(f"[dim]You can open this file in any editor[/dim]")
-                        if i < len(saved_files):
-                            file_messages.append("")  # Add spacing between files
-                    
-                    files_panel = Panel(
-                        "\n".join(file_messages),
-                        title="[bold green]💾 Files Saved to Your Computer[/bold green]",
-                        border_style="green",
-                        box=box.DOUBLE
-                    )
-                    self.console.print(files_panel)
+                    self.console.print("[dim]Kreggscode GPT is thinking... (Ctrl+C to cancel)[/dim]")
             
             except KeyboardInterrupt:
-                self.console.print("\n\n[yellow]Interrupted. Type 'exit' to quit.[/yellow]")
+                if self.cancel_turns():
+                    self.console.print("\n\n[yellow]Request cancelled.[/yellow]")
+                else:
+                    self.console.print("\n\n[yellow]Interrupted. Type 'exit' to quit.[/yellow]")
                 continue
             
             except Exception as e:
                 self.console.print(f"\n[red]✗ Error:[/red] {str(e)}", style="bold")
+        
+        # Stop the worker
+        self.pending_prompts.put(None)
+        self.worker.join(timeout=1)
+        
+        # Write any pending search index updates
+        if self.search_index:
+            self.search_index.close()
     
     def run(self):
         """Run the application"""
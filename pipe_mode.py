@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipe Mode for Kreggscode GPT
+One-shot, non-interactive entry point for scripts and pipelines
+
+Only the standard library is imported, so start-up is close to a bare
+interpreter. rich, pyperclip, langdetect and requests are never loaded.
+
+Examples:
+    python pipe_mode.py "Write a regex that matches IPv4 addresses"
+    echo "Explain Python decorators" | python pipe_mode.py
+    cat prompts.txt | python pipe_mode.py --lines --json --jobs 8
+"""
+
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+from typing import Optional, List, Dict, Iterable, Iterator, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from settings import BASE_URL, DEFAULT_SYSTEM_PROMPT
+
+
+class PipeError(Exception):
+    """Raised when a one-shot request fails"""
+
+
+class PipeClient:
+    """
+    Minimal keep-alive client for the chat endpoint, built on http.client
+    
+    Honors HTTP_PROXY, HTTPS_PROXY and NO_PROXY and follows redirects like
+    requests does. SOCKS proxies and compressed responses are not supported.
+    """
+    
+    # Redirects followed per request before giving up
+    MAX_REDIRECTS = 5
+    
+    def __init__(self, base_url: str = BASE_URL, model: str = "openai",
+                 temperature: float = 1.0, system_prompt: Optional[str] = DEFAULT_SYSTEM_PROMPT,
+                 timeout: float = 60):
+        """
+        Initialize Pipe Client
+        
+        Args:
+            base_url: API base URL (default: Pollinations.AI)
+            model: AI model to use (default: openai)
+            temperature: Creativity level 0.0-3.0 (default: 1.0)
+            system_prompt: System prompt sent with every request, or None
+            timeout: Socket timeout in seconds (default: 60)
+        """
+        self.url = base_url.rstrip('/') + "/openai"
+        self.model = model
+        self.temperature = max(0.0, min(3.0, temperature))
+        self.system_prompt = system_prompt
+        self.timeout = timeout
+        self._conn = None
+        self._conn_key = None
+    
+    def _proxy_for(self, scheme: str, host: str) -> Optional[str]:
+        """
+        Get the proxy configured in the environment for a URL
+        
+        Args:
+            scheme: URL scheme (http or https)
+            host: Host name
+            
+        Returns:
+            Proxy URL, or None to connect directly
+        """
+        # urllib.request is only imported when a proxy variable is set
+        if not any(name.lower().endswith('_proxy') for name in os.environ):
+            return None
+        from urllib.request import getproxies_environment, proxy_bypass_environment
+        proxies = getproxies_environment()
+        if scheme not in proxies or proxy_bypass_environment(host, proxies):
+            return None
+        return proxies[scheme]
+    
+    def _connection(self, url: str) -> Tuple[http.client.HTTPConnection, str, Dict[str, str]]:
+        """
+        Get a keep-alive connection for a URL, reusing the current one if possible
+        
+        Args:
+            url: Absolute URL to request
+            
+        Returns:
+            Tuple (connection, request target, extra headers)
+        """
+        parts = urlsplit(url)
+        secure = parts.scheme == 'https'
+        host = parts.hostname
+        port = parts.port or (443 if secure else 80)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else "")
+        headers = {}
+        
+        proxy = self._proxy_for(parts.scheme, host)
+        proxy_auth = {}
+        if proxy:
+            proxy_parts = urlsplit(proxy if '://' in proxy else f"http://{proxy}")
+            if proxy_parts.username:
+                import base64
+                from urllib.parse import unquote
+                credentials = f"{unquote(proxy_parts.username)}:{unquote(proxy_parts.password or '')}"
+                proxy_auth['Proxy-Authorization'] = "Basic " + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+            if not secure:
+                # Plain HTTP goes through the proxy with the absolute URL
+                target = url
+                headers.update(proxy_auth)
+        
+        key = (parts.scheme, host, port, proxy)
+        if self._conn is None or self._conn_key != key:
+            self.close()
+            conn_cls = http.client.HTTPSConnection if secure else http.client.HTTPConnection
+            if proxy:
+                conn = conn_cls(proxy_parts.hostname, proxy_parts.port or 8080, timeout=self.timeout)
+                if secure:
+                    # HTTPS is tunneled through the proxy with CONNECT
+                    conn.set_tunnel(host, port, headers=proxy_auth)
+            else:
+                conn = conn_cls(host, port, timeout=self.timeout)
+            self._conn, self._conn_key = conn, key
+        
+        return self._conn, target, headers
+    
+    def close(self):
+        """Close the connection, if open"""
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = self._conn_key = None
+    
+    def ask(self, prompt: str) -> str:
+        """
+        Send a single prompt without conversation history
+        
+        Args:
+            prompt: The prompt to send
+            
+        Returns:
+            AI's response as a string
+            
+        Raises:
+            PipeError: If the request fails or the response can't be parsed
+        """
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        body = json.dumps({
+            "model": self.model,
+            "messages": messages,
+            "temperature": self.temperature,
+            "stream": False
+        }).encode('utf-8')
+        
+        method, url = 'POST', self.url
+        for _ in range(self.MAX_REDIRECTS + 1):
+            status, reason, location, payload = self._request(method, url, body if method == 'POST' else None)
+            if status not in (301, 302, 303, 307, 308) or not location:
+                break
+            url = urljoin(url, location)
+            # Like requests, only 307 and 308 repeat the POST
+            if status in (301, 302, 303):
+                method = 'GET'
+        else:
+            raise PipeError(f"Error communicating with AI: more than {self.MAX_REDIRECTS} redirects")
+        
+        if status >= 400:
+            raise PipeError(f"Error communicating with AI: HTTP {status} {reason}")
+        
+        try:
+            return json.loads(payload)['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise PipeError(f"Error parsing AI response: {str(e)}")
+    
+    def _request(self, method: str, url: str, body: Optional[bytes]) -> Tuple[int, str, Optional[str], bytes]:
+        """
+        Send one HTTP request and read the whole response
+        
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            body: Request body, or None
+            
+        Returns:
+            Tuple (status, reason, location header, body)
+            
+        Raises:
+            PipeError: If the request fails
+        """
+        # A reused connection may have been closed by the server; retry once
+        for attempt in range(2):
+            conn, target, headers = self._connection(url)
+            reused = conn.sock is not None
+            headers['Accept'] = "application/json"
+            if body is not None:
+                headers['Content-Type'] = "application/json"
+            try:
+                conn.request(method, target, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.reason, response.getheader('Location'), response.read()
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                if reused and attempt == 0:
+                    continue
+                raise PipeError(f"Error communicating with AI: {str(e).strip() or type(e).__name__}")
+
+
+def extract_code_blocks(text: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Extract code blocks as JSON-friendly dictionaries
+    
+    Args:
+        text: Text containing code blocks
+        
+    Returns:
+        List of dictionaries with language, filename and code keys
+    """
+    from file_manager import FileManager
+    return [
+        {'language': lang, 'filename': filename, 'code': code}
+        for lang, code, filename in FileManager.extract_code_blocks(text)
+    ]
+
+
+def run_prompts(prompts: Iterable[str], make_client, jobs: int) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Answer prompts concurrently, yielding results in input order
+    
+    Prompts are read lazily, so answers stream out while input is still
+    arriving; at most jobs * 2 prompts are queued ahead of the workers.
+    
+    Args:
+        prompts: Prompts to send
+        make_client: Factory returning a new PipeClient (one per worker)
+        jobs: Number of concurrent requests
+        
+    Yields:
+        Tuples (prompt, response, error)
+    """
+    # One job: answer inline, no threads needed
+    if jobs == 1:
+        client = make_client()
+        try:
+            for prompt in prompts:
+                try:
+                    result = (prompt, client.ask(prompt), None)
+                except PipeError as e:
+                    result = (prompt, None, str(e))
+                except Exception as e:
+                    result = (prompt, None, f"Unexpected error: {e!r}")
+                yield result
+        finally:
+            client.close()
+        return
+    
+    import queue
+    tasks = queue.Queue(maxsize=jobs * 2)
+    results: Dict[int, Tuple[str, Optional[str], Optional[str]]] = {}
+    ready = threading.Condition()
+    total = [None]  # Number of prompts, set once input is exhausted
+    
+    def worker(client):
+        try:
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                index, prompt = task
+                # Always post a result, or the emitter would wait for it forever
+                try:
+                    result = (prompt, client.ask(prompt), None)
+                except PipeError as e:
+                    result = (prompt, None, str(e))
+                except Exception as e:
+                    result = (prompt, None, f"Unexpected error: {e!r}")
+                with ready:
+                    results[index] = result
+                    ready.notify_all()
+        finally:
+            client.close()
+    
+    def feeder():
+        count = 0
+        for prompt in prompts:
+            tasks.put((count, prompt))
+            count += 1
+        for _ in range(jobs):
+            tasks.put(None)
+        with ready:
+            total[0] = count
+            ready.notify_all()
+    
+    # Clients are created here so a bad configuration raises to the caller
+    clients = [make_client() for _ in range(jobs)]
+    threads = [threading.Thread(target=worker, args=(client,), daemon=True) for client in clients]
+    threads.append(threading.Thread(target=feeder, daemon=True))
+    for thread in threads:
+        thread.start()
+    
+    next_index = 0
+    while True:
+        with ready:
+            while next_index not in results and total[0] != next_index:
+                ready.wait()
+            if next_index not in results:
+                break
+            result = results.pop(next_index)
+        yield result
+        next_index += 1
+
+
+def read_prompts(args) -> Iterable[str]:
+    """
+    Get prompts from the command line or stdin
+    
+    Args:
+        args: Parsed command-line arguments
+        
+    Returns:
+        Iterable of non-empty prompts
+    """
+    if args.prompt:
+        return [' '.join(args.prompt)]
+    if args.lines:
+        return (line.strip() for line in sys.stdin if line.strip())
+    text = sys.stdin.read().strip()
+    return [text] if text else []
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point
+    
+    Returns:
+        Exit code: 0 on success, 1 if any prompt failed, 2 on usage errors
+    """
+    parser = argparse.ArgumentParser(
+        description="Send prompts to Kreggscode GPT without the interactive interface"
+    )
+    parser.add_argument('prompt', nargs='*', help="Prompt to send (read from stdin if omitted)")
+    parser.add_argument('-l', '--lines', action='store_true',
+                        help="Treat each stdin line as a separate prompt")
+    parser.add_argument('-j', '--jobs', type=int, default=4,
+                        help="Concurrent requests with --lines (default: 4)")
+    parser.add_argument('--json', action='store_true',
+                        help="Print one JSON object per prompt with the extracted code blocks")
+    parser.add_argument('--save', nargs='?', const="generated", metavar='DIR',
+                        help="Save code blocks as files (default DIR: generated)")
+    parser.add_argument('--model', default="openai", help="AI model (default: openai)")
+    parser.add_argument('--temperature', type=float, default=1.0,
+                        help="Creativity level 0.0-3.0 (default: 1.0)")
+    parser.add_argument('--no-system-prompt', action='store_true',
+                        help="Send the prompt without the Kreggscode GPT system prompt")
+    parser.add_argument('--base-url', default=BASE_URL, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    
+    prompts = read_prompts(args)
+    
+    def make_client():
+        return PipeClient(
+            base_url=args.base_url,
+            model=args.model,
+            temperature=args.temperature,
+            system_prompt=None if args.no_system_prompt else DEFAULT_SYSTEM_PROMPT
+        )
+    
+    file_manager = None
+    if args.save:
+        from file_manager import FileManager
+        file_manager = FileManager(output_dir=args.save)
+    
+    exit_code = 0
+    jobs = args.jobs if args.lines else 1
+    out = sys.stdout
+    
+    for prompt, response, error in run_prompts(prompts, make_client, jobs):
+        saved_files = []
+        if response is not None and file_manager:
+            try:
+                saved_files = file_manager.process_ai_response(response, prompt)
+            except IOError as e:
+                error = str(e)
+        
+        if error:
+            exit_code = 1
+        
+        if args.json:
+            out.write(json.dumps({
+                'prompt': prompt,
+                'response': response,
+                'code_blocks': extract_code_blocks(response) if response else [],
+                'saved_files': saved_files,
+                'error': error,
+            }, ensure_ascii=False) + "\n")
+        else:
+            if response is not None:
+                out.write(response if response.endswith("\n") else response + "\n")
+            if error:
+                sys.stderr.write(f"{error}\n")
+            for filepath in saved_files:
+                sys.stderr.write(f"Saved: {filepath}\n")
+        out.flush()
+    
+    return exit_code
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`); exit quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
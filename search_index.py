@@ -0,0 +1,216 @@
+"""
+Search Index for Kreggscode GPT
+Full-text search over past conversations and generated files using SQLite FTS5
+"""
+
+import queue
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Any
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    path TEXT,
+    created REAL NOT NULL,
+    prompt TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS documents_path ON documents(path);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    prompt, content,
+    content='documents', content_rowid='id',
+    tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS documents_ai AFTER INSERT ON documents BEGIN
+    INSERT INTO documents_fts(rowid, prompt, content)
+    VALUES (new.id, new.prompt, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_ad AFTER DELETE ON documents BEGIN
+    INSERT INTO documents_fts(documents_fts, rowid, prompt, content)
+    VALUES ('delete', old.id, old.prompt, old.content);
+END;
+"""
+
+
+class SearchIndex:
+    """Incrementally maintained full-text index of prompts, responses and saved files"""
+    
+    # Maximum number of queued updates written in one transaction
+    BATCH_SIZE = 500
+    # Seconds close() waits for pending updates before giving up on them
+    CLOSE_TIMEOUT = 5
+    
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        Initialize Search Index
+        
+        Args:
+            db_path: SQLite database file (default: ~/.kreggscode_gpt/search.db)
+        """
+        self.db_path = Path(db_path) if db_path else Path.home() / ".kreggscode_gpt" / "search.db"
+        try:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        except PermissionError:
+            # Fallback to temp directory
+            import tempfile
+            self.db_path = Path(tempfile.gettempdir()) / "kreggscode_gpt" / self.db_path.name
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Reader connection for searches; the writer thread has its own
+        self._reader = self._connect(check_same_thread=False)
+        self._reader.executescript(SCHEMA)
+        self._read_lock = threading.Lock()
+        
+        # Updates are queued and written by a background thread
+        self._updates = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="search-index", daemon=True)
+        self._writer.start()
+    
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open a connection tuned for one writer and concurrent readers"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=check_same_thread)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+    
+    def _write_loop(self):
+        """Apply queued updates in batched transactions until close() is called"""
+        conn = self._connect()
+        running = True
+        
+        while running:
+            batch = [self._updates.get()]
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._updates.get_nowait())
+                except queue.Empty:
+                    break
+            
+            updates = [update for update in batch if update is not None]
+            if len(updates) < len(batch):
+                running = False
+            
+            try:
+                with conn:
+                    for sql, params in updates:
+                        conn.execute(sql, params)
+            except sqlite3.Error:
+                # The batch was rolled back; apply its updates one by one so a
+                # single bad update doesn't lose the rest. The index is
+                # best-effort, so updates that still fail are skipped
+                for sql, params in updates:
+                    try:
+                        with conn:
+                            conn.execute(sql, params)
+                    except sqlite3.Error:
+                        pass
+            finally:
+                for _ in batch:
+                    self._updates.task_done()
+        
+        conn.close()
+    
+    def add_turn(self, prompt: str, response: str, saved_files: Optional[List[str]] = None):
+        """
+        Queue a conversation turn for indexing
+        
+        Args:
+            prompt: The user's prompt
+            response: The AI's response
+            saved_files: Paths of files saved from the response
+        """
+        self._updates.put((
+            "INSERT INTO documents (kind, path, created, prompt, content) VALUES ('turn', ?, ?, ?, ?)",
+            ("\n".join(saved_files) if saved_files else None, time.time(), prompt, response)
+        ))
+    
+    def add_file(self, path: str, content: str):
+        """
+        Queue a saved file for indexing, replacing any earlier version
+        
+        Args:
+            path: Path of the saved file
+            content: File content
+        """
+        self._updates.put(("DELETE FROM documents WHERE kind = 'file' AND path = ?", (path,)))
+        self._updates.put((
+            "INSERT INTO documents (kind, path, created, prompt, content) VALUES ('file', ?, ?, '', ?)",
+            (path, time.time(), content)
+        ))
+    
+    def forget_files(self):
+        """Queue removal of all indexed files (conversations are kept)"""
+        self._updates.put(("DELETE FROM documents WHERE kind = 'file'", ()))
+    
+    def search(self, query: str, limit: int = 10,
+               highlight: tuple = ('[', ']')) -> List[Dict[str, Any]]:
+        """
+        Search conversations and files, best matches first
+        
+        Every match is ranked, so the cost grows with the number of matching
+        entries: rare words take milliseconds, while a word found in most of
+        200,000 indexed turns takes around half a second. Adding words that
+        narrow the results makes a search faster.
+        
+        Args:
+            query: Words to search for; all must match
+            limit: Maximum number of hits (default: 10)
+            highlight: Markers placed around matched words in snippets
+            
+        Returns:
+            List of hits with kind, path, created, prompt and snippet keys
+        """
+        # Quote each word so user input is never parsed as FTS syntax
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        match = ' '.join(f'"{term}"' for term in terms)
+        
+        with self._read_lock:
+            # Rank every match, then build snippets for the top hits only
+            ids = self._reader.execute(
+                """
+                SELECT rowid FROM documents_fts
+                WHERE documents_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, limit)
+            ).fetchall()
+            
+            rows = []
+            for (rowid,) in ids:
+                row = self._reader.execute(
+                    """
+                    SELECT d.kind, d.path, d.created, d.prompt,
+                           snippet(documents_fts, -1, ?, ?, '…', 12)
+                    FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid
+                    WHERE documents_fts MATCH ? AND documents_fts.rowid = ?
+                    """,
+                    (highlight[0], highlight[1], match, rowid)
+                ).fetchone()
+                if row:
+                    rows.append(row)
+        
+        return [
+            {'kind': kind, 'path': path, 'created': created, 'prompt': prompt, 'snippet': snippet}
+            for kind, path, created, prompt, snippet in rows
+        ]
+    
+    def flush(self):
+        """Block until all queued updates have been written"""
+        self._updates.join()
+    
+    def close(self):
+        """Write pending updates and stop the writer thread, waiting at most CLOSE_TIMEOUT seconds"""
+        if self._writer.is_alive():
+            self._updates.put(None)
+            self._writer.join(timeout=self.CLOSE_TIMEOUT)
+        with self._read_lock:
+            self._reader.close()
@@ -0,0 +1,13 @@
+"""
+Settings for Kreggscode GPT
+Shared defaults that can be imported without any third-party packages
+"""
+
+# Pollinations.AI text endpoint
+BASE_URL = "https://text.pollinations.ai"
+
+# System prompt used for every conversation
+DEFAULT_SYSTEM_PROMPT = """You are Kreggscode GPT, a helpful AI assistant.
+You are knowledgeable, friendly, and excellent at programming and technical tasks.
+When users ask you to create files, provide the code in markdown code blocks with the language specified.
+Always be helpful and respond in the same language as the user's input."""